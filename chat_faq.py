@@ -1,107 +1,242 @@
-import json
-import spacy
+import os
+import pickle
+import re
+import numpy as np
+import orjson
 import streamlit as st
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import random
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from functools import lru_cache
+
+try:
+    import cupy
+    from cupyx.scipy import sparse as cupy_sparse
+except ImportError:
+    cupy = None
+
+# Bump when preprocessing or vectorizer settings change to invalidate disk caches
+INDEX_CACHE_VERSION = 7
+
+# Below this many FAQs the GPU transfer costs more than CPU scoring
+GPU_MIN_FAQS = 50_000
+
+# Words of three or more letters, plus numbers with an optional currency sign
+_TOKEN_RE = re.compile(r"[A-Za-z]{3,}|\$?\d+(?:[.,]\d+)*")
+
+# Words that route a (lower-cased) query to the pricing handler
+_PRICE_QUERY_RE = re.compile(
+    r"\b(?:price[sd]?|pricey|pricing|costs?|costly|how much)\b"
+)
+
+def _identity(tokens):
+    """Pass pre-tokenized input through the vectorizer unchanged"""
+    return tokens
+
+@lru_cache(maxsize=None)
+def _stop_words():
+    """Load spaCy's English stop words on first use, keeping spaCy off cold start"""
+    from spacy.lang.en.stop_words import STOP_WORDS
+    return frozenset(STOP_WORDS)
+
+def _keyword_pattern(keywords):
+    """Compile keywords into one alternation that never matches when empty"""
+    keywords = sorted(filter(None, keywords), key=len, reverse=True)
+    return re.compile('|'.join(map(re.escape, keywords)) or '(?!)')
 
 class LuxuryBoutiqueChatbot:
     def __init__(self, faq_file_path):
         self.faqs = self.load_faqs(faq_file_path)
-        self.nlp = spacy.load("en_core_web_sm")
+        self._preprocess_cached = lru_cache(maxsize=4096)(self._preprocess)
         self.collections = self.get_unique_collections()
+        self.by_collection = self.group_by_collection()
+        self.by_price_range = self.group_by_price_range()
+        self.collection_lookup = {c.lower(): c for c in self.collections}
+        self.collection_pattern = _keyword_pattern(self.collection_lookup)
+        self.price_pattern = _keyword_pattern(self.by_price_range)
         
         # Initialize NLP components
-        self.search_texts = self.build_search_context()
-        self.vectorizer = TfidfVectorizer(
-            tokenizer=self.preprocess_text,
-            min_df=2,
-            token_pattern=None
+        self.hasher = HashingVectorizer(
+            n_features=2**15,
+            alternate_sign=False,
+            norm=None,
+            tokenizer=_identity,
+            preprocessor=_identity,
+            lowercase=False,
+            token_pattern=None,
+            dtype=np.float32
         )
-        self.question_vectors = self.vectorizer.fit_transform(self.search_texts)
+        self.search_texts = self.build_search_context()
+        self.tfidf, self.question_vectors = self.load_index(faq_file_path)
+        # Term-major copy acts as an inverted index: scoring a query only
+        # walks the postings of the terms it contains
+        self.term_index = self.question_vectors.T.tocsr()
+        self.gpu_term_index = self.load_gpu_index()
 
     def load_faqs(self, file_path):
         """Load and validate FAQ data with proper error handling"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+            with open(file_path, 'rb') as file:
+                data = orjson.loads(file.read())
                 return data.get("faqs", [])
         except Exception as e:
             st.error(f"Error loading FAQ file: {str(e)}")
             return []
 
+    def load_index(self, faq_file_path):
+        """Load the fitted TF-IDF index from disk, rebuilding it when stale"""
+        cache_path = os.path.splitext(faq_file_path)[0] + ".cache.pkl"
+        cache_key = (INDEX_CACHE_VERSION, os.stat(faq_file_path).st_mtime)
+        try:
+            with open(cache_path, 'rb') as file:
+                key, tfidf, question_vectors = pickle.load(file)
+            if key == cache_key:
+                return tfidf, question_vectors
+        except Exception:
+            pass
+
+        tfidf, question_vectors = self.build_index()
+        try:
+            with open(cache_path, 'wb') as file:
+                pickle.dump((cache_key, tfidf, question_vectors), file)
+        except OSError:
+            pass
+        return tfidf, question_vectors
+
+    def build_index(self):
+        """Fit TF-IDF weights over the hashed, tokenized search texts"""
+        if not self.search_texts:
+            raise ValueError("No FAQs to index")
+        tokenized = [self.tokenize(text) for text in self.search_texts]
+        counts = self.hasher.transform(tokenized)
+        # L2-normalized rows let best_match() use a plain dot product as the cosine
+        tfidf = TfidfTransformer(norm='l2').fit(counts)
+        # Drop terms found in fewer than two FAQs, like min_df=2 did, by
+        # zeroing their idf so they weigh nothing in FAQs and queries alike
+        doc_freq = np.bincount(counts.indices, minlength=counts.shape[1])
+        tfidf.idf_ = np.where(doc_freq >= 2, tfidf.idf_, 0).astype(tfidf.idf_.dtype)
+        question_vectors = tfidf.transform(counts)
+        question_vectors.eliminate_zeros()
+        return tfidf, question_vectors.astype(np.float32, copy=False)
+
+    def vectorize(self, tokenized):
+        """Hash token lists and apply the fitted TF-IDF weights"""
+        vectors = self.tfidf.transform(self.hasher.transform(tokenized))
+        return vectors.astype(np.float32, copy=False)
+
+    def load_gpu_index(self):
+        """Copy the inverted index to the GPU for large catalogs, if available"""
+        if cupy is None or len(self.faqs) < GPU_MIN_FAQS:
+            return None
+        try:
+            if not cupy.cuda.is_available():
+                return None
+            return cupy_sparse.csr_matrix(self.term_index)
+        except Exception:
+            return None
+
     def get_unique_collections(self):
-        """Extract unique collections from FAQs"""
-        return list({faq.get('collection', '') for faq in self.faqs})
+        """Extract unique collections from FAQs in first-seen order"""
+        return list(dict.fromkeys(faq.get('collection', '') for faq in self.faqs))
+
+    def group_by_collection(self):
+        """Index FAQs by collection for collection lookups"""
+        groups = {}
+        for faq in self.faqs:
+            groups.setdefault(faq.get('collection'), []).append(faq)
+        return groups
+
+    def group_by_price_range(self):
+        """Index FAQs by lower-cased price range for pricing lookups"""
+        groups = {}
+        for faq in self.faqs:
+            if 'price_range' in faq:
+                groups.setdefault(faq['price_range'].lower(), []).append(faq)
+        return groups
 
     def build_search_context(self):
         """Create enhanced search context with key information"""
         contexts = []
         for faq in self.faqs:
-            context = (
-                f"{faq['question']} "
-                f"{faq.get('answer', '')} "
-                f"{' '.join(faq.get('tags', []))} "
-                f"{faq.get('collection', '')} "
-                f"{faq.get('price_range', '')} "
-                f"{self.process_services(faq.get('services', []))}"
-            )
-            contexts.append(context)
+            get = faq.get
+            contexts.append(' '.join((
+                faq['question'],
+                get('answer', ''),
+                ' '.join(get('tags', [])),
+                get('collection', ''),
+                get('price_range', ''),
+                self.process_services(get('services', {}))
+            )))
         return contexts
 
     def process_services(self, services):
-        """Convert service tuples to searchable text"""
-        return ' '.join([f"SERVICE_{s[0].replace(' ', '_')}" for s in services])
+        """Convert service names to searchable text"""
+        return ' '.join([f"SERVICE_{name.replace(' ', '_')}" for name in services.get('names', [])])
 
     def preprocess_text(self, text):
         """Enhanced text preprocessing with price awareness"""
-        doc = self.nlp(text)
-        tokens = []
-        for token in doc:
-            if token.is_stop or token.is_punct:
-                continue
-            if token.like_num or token.is_currency:
-                tokens.append(token.text.lower())
-            elif token.is_alpha and len(token) > 2:
-                tokens.append(token.lemma_.lower())
-        return tokens or ['boutique', 'shirt']
+        return list(self._preprocess_cached(text))
+
+    def _preprocess(self, text):
+        """Tokenize a single text into a hashable tuple for the LRU cache"""
+        return tuple(self.tokenize(text))
+
+    def tokenize(self, text):
+        """Lower-case word and price tokens with stop words removed"""
+        stop_words = _stop_words()
+        tokens = [token.lower() for token in _TOKEN_RE.findall(text)]
+        return [token for token in tokens if token not in stop_words] or ['boutique', 'shirt']
 
     def generate_response(self, user_query):
         """Generate responses with priority to pricing and collections"""
+        query_lower = user_query.lower()
+
         # First handle price queries
-        if any(word in user_query.lower() for word in ['price', 'cost', 'how much']):
-            return self.handle_pricing_query(user_query)
+        if _PRICE_QUERY_RE.search(query_lower):
+            return self.handle_pricing_query(query_lower)
             
         # Then handle collection queries
-        for collection in self.collections:
-            if collection.lower() in user_query.lower():
-                return self.handle_collection_query(collection)
+        match = self.collection_pattern.search(query_lower)
+        if match:
+            return self.handle_collection_query(self.collection_lookup[match.group()])
         
         # General response handling
-        query_vec = self.vectorizer.transform([user_query])
-        similarities = cosine_similarity(query_vec, self.question_vectors)
-        best_idx = similarities.argmax()
+        query_vec = self.vectorize([self.preprocess_text(user_query)])
+        best_idx, best_score = self.best_match(query_vec)
         
-        if similarities[0, best_idx] > 0.4:
+        if best_score > 0.4:
             return self.format_response(self.faqs[best_idx])
         return self.get_fallback_response()
 
-    def handle_pricing_query(self, query):
-        """Specialized pricing response handler"""
+    def best_match(self, query_vec):
+        """Index and cosine similarity of the closest FAQ, or (None, 0.0)"""
+        if self.gpu_term_index is not None:
+            matches = cupy_sparse.csr_matrix(query_vec) @ self.gpu_term_index
+        else:
+            matches = query_vec @ self.term_index
+        # Only FAQs sharing a term with the query are stored in the sparse
+        # row, so the argmax never touches the rest of the catalog
+        if matches.nnz == 0:
+            return None, 0.0
+        # Sorted column order keeps ties on the lowest FAQ index
+        matches.sort_indices()
+        best = int(matches.data.argmax())
+        return int(matches.indices[best]), float(matches.data[best])
+
+    def handle_pricing_query(self, query_lower):
+        """Specialized pricing response handler (expects a lower-cased query)"""
         price_info = []
-        for faq in self.faqs:
-            if 'price_range' in faq:
-                if faq['price_range'].lower() in query.lower():
-                    price_info.append(
-                        f"**{faq.get('collection', 'Collection')}**\n"
-                        f"Price Range: {faq['price_range']}\n"
-                        f"Inclusions: {faq['answer']}\n"
-                    )
+        matched = dict.fromkeys(self.price_pattern.findall(query_lower))
+        for price_range in matched:
+            for faq in self.by_price_range[price_range]:
+                price_info.append(
+                    f"**{faq.get('collection', 'Collection')}**\n"
+                    f"Price Range: {faq['price_range']}\n"
+                    f"Inclusions: {faq['answer']}\n"
+                )
         return "\n".join(price_info) if price_info else self.get_fallback_pricing()
 
     def handle_collection_query(self, collection):
         """Handle collection-specific queries"""
-        collection_faqs = [f for f in self.faqs if f.get('collection') == collection]
+        collection_faqs = self.by_collection.get(collection, [])
         if not collection_faqs:
             return f"Sorry, we couldn't find details about {collection}"
             
@@ -121,7 +256,11 @@ class LuxuryBoutiqueChatbot:
         response.append(faq['answer'])
         if 'services' in faq:
             response.append("\n**Services Available:**")
-            response.extend([f"- {s[0]} ({s[2]})" for s in faq['services'][:2]])
+            services = faq['services']
+            response.extend([
+                f"- {name} ({price})"
+                for name, price in zip(services['names'][:2], services['prices'][:2])
+            ])
         return "\n".join(response)
 
     def get_fallback_response(self):
@@ -143,47 +282,64 @@ class LuxuryBoutiqueChatbot:
         )
 
 # Streamlit UI Configuration
-st.set_page_config(page_title="Boutique Assistant", page_icon="👔")
-
-# Custom Styling
-st.markdown("""
-<style>
-    [data-testid=stSidebar] { background-color: #f8f9fa; }
-    .stChatInput input { border: 2px solid #4a4a4a; }
-    .stMarkdown { color: #2d3436; }
-</style>
-""", unsafe_allow_html=True)
-
-# Chat Interface
-st.title("👑 She Designs FAQ CHATBOT")
-st.markdown("""
-**Ask about:**
-- Collection [Casual, Luxury Artisan, Premium Designer] Prices
-- Shirt Care
-- Custom Services
-- Shipping Options
-""")
+def render_header():
+    """Inject the custom styling and static chat header"""
+    # Custom Styling
+    st.markdown("""
+    <style>
+        [data-testid=stSidebar] { background-color: #f8f9fa; }
+        .stChatInput input { border: 2px solid #4a4a4a; }
+        .stMarkdown { color: #2d3436; }
+    </style>
+    """, unsafe_allow_html=True)
 
-# Initialize Chatbot
-try:
-    bot = LuxuryBoutiqueChatbot("faqs.json")
-except Exception as e:
-    st.error(f"Failed to initialize chatbot: {str(e)}")
-    st.stop()
+    # Chat Interface
+    st.title("👑 She Designs FAQ CHATBOT")
+    st.markdown("""
+    **Ask about:**
+    - Collection [Casual, Luxury Artisan, Premium Designer] Prices
+    - Shirt Care
+    - Custom Services
+    - Shipping Options
+    """)
 
-# Chat History Management
-if "messages" not in st.session_state:
+def clear_conversation():
+    """Empty the chat history before the rerun draws it"""
     st.session_state.messages = []
 
-# Display Chat History
-for msg in st.session_state.messages:
-    with st.chat_message(msg["role"]):
-        st.markdown(msg["content"])
+def render_sidebar():
+    """Render the static sidebar information and conversation controls"""
+    with st.sidebar:
+        st.header("Boutique Services")
+        st.markdown("""
+        - **Custom Tailoring** ✂️
+        - **Monogramming** 🧵
+        - **VIP Consultations** 👑
+        - **Eco-Friendly Cleaning** 🌿
+        """)
+        
+        st.divider()
+        st.subheader("Try Asking:")
+        st.markdown("""
+        - "Price of casual shirts"
+        - "What's in the luxury collection?"
+        - "How to care for silk shirts"
+        - "Do you offer gift wrapping?"
+        """)
+        
+        st.button("Clear Conversation", on_click=clear_conversation)
+
+def render_history():
+    """Display the chat history"""
+    for msg in st.session_state.messages:
+        with st.chat_message(msg["role"]):
+            st.markdown(msg["content"])
+
+def handle_prompt(bot):
+    """Answer a submitted prompt before the rerun, so one run shows both messages"""
+    prompt = st.session_state.chat_prompt
 
-# User Input Handling
-if prompt := st.chat_input("How can I assist with our luxury shirts today?"):
     # Add user message
-    
     st.session_state.messages.append({"role": "user", "content": prompt})
     
     # Generate response
@@ -194,29 +350,34 @@ if prompt := st.chat_input("How can I assist with our luxury shirts today?"):
     
     # Add bot response
     st.session_state.messages.append({"role": "assistant", "content": response})
-    
-    # Rerun to update display
-    st.rerun()
 
-# Sidebar Information
-with st.sidebar:
-    st.header("Boutique Services")
-    st.markdown("""
-    - **Custom Tailoring** ✂️
-    - **Monogramming** 🧵
-    - **VIP Consultations** 👑
-    - **Eco-Friendly Cleaning** 🌿
-    """)
-    
-    st.divider()
-    st.subheader("Try Asking:")
-    st.markdown("""
-    - "Price of casual shirts"
-    - "What's in the luxury collection?"
-    - "How to care for silk shirts"
-    - "Do you offer gift wrapping?"
-    """)
-    
-    if st.button("Clear Conversation"):
-        st.session_state.messages = []
-        st.rerun()
\ No newline at end of file
+# Initialize Chatbot
+@st.cache_resource
+def load_chatbot(faq_file_path):
+    """Build the chatbot once per Streamlit worker and reuse it across reruns"""
+    return LuxuryBoutiqueChatbot(faq_file_path)
+
+st.set_page_config(page_title="Boutique Assistant", page_icon="👔")
+render_header()
+
+try:
+    bot = load_chatbot("faqs.json")
+except Exception as e:
+    st.error(f"Failed to initialize chatbot: {str(e)}")
+    st.stop()
+
+# Chat History Management
+if "messages" not in st.session_state:
+    st.session_state.messages = []
+
+render_history()
+
+# User Input Handling; kept at top level so the input stays pinned to the bottom
+st.chat_input(
+    "How can I assist with our luxury shirts today?",
+    key="chat_prompt",
+    on_submit=handle_prompt,
+    args=(bot,)
+)
+
+render_sidebar()
\ No newline at end of file
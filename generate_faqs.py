@@ -32,7 +32,8 @@ This approach would make each FAQ entry more unique, informative, and aligned wi
 """)
 # This script generates a JSON file containing 100 FAQs for a boutique specializing in cotton shirts.
 
-import json
+import orjson
+import numpy as np
 from datetime import datetime
 import random
 
@@ -103,23 +104,43 @@ Orders >$200 get complimentary 📦 premium packaging!"""
     
     return answer_components.get(faq_type, f"Discover boutique excellence in every stitch. Contact us for details.")
 
+sizes = ["Slim Fit", "Classic Fit", "Made-to-Measure"]
+faq_types = ["pricing", "care", "shipping"]
+question_templates = [
+    "How should I care for my {style} {name} shirt?",
+    "What makes your {name} collection special?",
+    "Can I get {style} shirts in {size}?",
+    "What's included in the price of {name} shirts?",
+    "Do you offer international shipping for {style} designs?"
+]
+
+# Draw every random choice for the whole batch up front
+num_faqs = 500
+rng = np.random.default_rng()
+collection_idxs = rng.integers(len(collections), size=num_faqs)
+style_draws = rng.random(num_faqs)
+size_idxs = rng.integers(len(sizes), size=num_faqs)
+faq_type_idxs = rng.integers(len(faq_types), size=num_faqs)
+question_idxs = rng.integers(len(question_templates), size=num_faqs)
+# Two distinct services per FAQ: shuffle each row of indices, keep the first two
+service_idxs = rng.permuted(np.tile(np.arange(len(services)), (num_faqs, 1)), axis=1)[:, :2]
+
 # Generate boutique-style FAQs
 faq_data = {"faqs": []}
 
-for i in range(1, 501):
-    collection = random.choice(collections)
-    style = random.choice(collection["styles"])
-    size = random.choice(["Slim Fit", "Classic Fit", "Made-to-Measure"])
-    faq_type = random.choice(["pricing", "care", "shipping"])
+for i in range(1, num_faqs + 1):
+    row = i - 1
+    collection = collections[collection_idxs[row]]
+    style = collection["styles"][int(style_draws[row] * len(collection["styles"]))]
+    size = sizes[size_idxs[row]]
+    faq_type = faq_types[faq_type_idxs[row]]
     
-    question = random.choice([
-        f"How should I care for my {style} {collection['name']} shirt?",
-        f"What makes your {collection['name']} collection special?",
-        f"Can I get {style} shirts in {size}?",
-        f"What's included in the price of {collection['name']} shirts?",
-        f"Do you offer international shipping for {style} designs?"
-    ])
+    question = question_templates[question_idxs[row]].format(
+        style=style, name=collection['name'], size=size
+    )
     
+    chosen_services = [services[j] for j in service_idxs[row]]
+
     faq_entry = {
         "id": i,
         "category": collection['name'],
@@ -128,15 +149,19 @@ for i in range(1, 501):
         "answer": generate_boutique_answer(faq_type, collection, style, size),
         "price_range": collection['price_range'],
         "collection": collection['name'],
-        "services": random.sample(services, k=2),
+        "services": {
+            "names": [s[0] for s in chosen_services],
+            "descs": [s[1] for s in chosen_services],
+            "prices": [s[2] for s in chosen_services]
+        },
         "last_updated": today
     }
     
     faq_data["faqs"].append(faq_entry)
 
 # Save to faqs.json
-with open("faqs.json", "w", encoding="utf-8") as f:
-    json.dump(faq_data, f, indent=4, ensure_ascii=False)
+with open("faqs.json", "wb") as f:
+    f.write(orjson.dumps(faq_data, option=orjson.OPT_INDENT_2))
 
 print(f"{i} Luxury boutique FAQs generated successfully! 🎉")
 